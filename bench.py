@@ -0,0 +1,168 @@
+"Rough benchmarks for the reading code"
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import speedread.main
+import speedread.segmentutils
+import speedread.streamutils
+import speedread.trieutils
+from speedread.textutils import WORD_TYPE
+
+
+def make_file(num_lines):
+    handle, path = tempfile.mkstemp()
+    with os.fdopen(handle, 'w') as f:
+        for i in xrange(num_lines):
+            f.write('line {} is short. \xc3\xa9\n'.format(i))
+    return path
+
+def make_single_line_file(megabytes):
+    "A file with no newlines at all"
+    handle, path = tempfile.mkstemp()
+    sentence = 'a sentence without any newlines in it. ' * 1000
+    with os.fdopen(handle, 'w') as f:
+        for _ in xrange(megabytes * 1024 * 1024 / len(sentence)):
+            f.write(sentence)
+    return path
+
+def make_dictionary(num_words):
+    "A word list file of made up Chinese words"
+    rand = random.Random(0)
+    handle, path = tempfile.mkstemp()
+    with os.fdopen(handle, 'w') as f:
+        for _ in xrange(num_words):
+            length = rand.choice((1, 2, 2, 2, 3, 4))
+            word = u''.join(unichr(0x4e00 + rand.randrange(3000)) for _ in xrange(length))
+            f.write(word.encode('utf8') + '\n')
+    return path
+
+def make_cjk_file(dictionary, num_lines):
+    "Sentences of words from dictionary with no spaces"
+    rand = random.Random(0)
+    with open(dictionary) as f:
+        words = list(speedread.trieutils.read_word_list(f))
+
+    def random_word():
+        # Roughly Zipf's law like real text
+        return words[int(len(words) ** rand.random()) - 1]
+
+    handle, path = tempfile.mkstemp()
+    with os.fdopen(handle, 'w') as f:
+        for _ in xrange(num_lines):
+            sentences = [u''.join(random_word() for _ in xrange(8)) for _ in xrange(3)]
+            f.write((u'\u3002'.join(sentences) + u'\u3002\n').encode('utf8'))
+    return path
+
+def timed(f):
+    start = time.time()
+    count = f()
+    return count, time.time() - start
+
+def tell_readline_lines(path):
+    "How Reader used to read lines"
+    with open(path) as stream:
+        count = 0
+        while True:
+            stream.tell()
+            if not stream.readline().decode('utf8'):
+                return count
+            count += 1
+
+def block_reader_lines(path):
+    with open(path) as stream:
+        lines = speedread.streamutils.BlockLineReader(stream)
+        count = 0
+        while True:
+            lines.tell()
+            if not lines.readline():
+                return count
+            count += 1
+
+def reader_words(path):
+    with open(path) as stream:
+        reader = speedread.main.Reader(stream)
+        count = 0
+        while reader.get_word().type != WORD_TYPE.END_OF_FILE:
+            count += 1
+        return count
+
+def profile_words(path, line_to_words):
+    with open(path) as stream:
+        reader = speedread.main.Reader(stream, line_to_words=line_to_words)
+        count = 0
+        while reader.get_word().type != WORD_TYPE.END_OF_FILE:
+            count += 1
+        return count
+
+def single_line_first_word(path):
+    with open(path) as stream:
+        speedread.main.Reader(stream).get_word()
+        return 1
+
+def single_line_words(path, count=1000000):
+    with open(path) as stream:
+        reader = speedread.main.Reader(stream)
+        for _ in xrange(count):
+            reader.get_word()
+        return count
+
+BENCHMARKS = [
+    ('tell+readline', 'lines', tell_readline_lines),
+    ('BlockLineReader', 'lines', block_reader_lines),
+    ('Reader.get_word', 'words', reader_words),
+]
+
+def main():
+    PARSER = argparse.ArgumentParser(description='Benchmark reading')
+    PARSER.add_argument('--lines', type=int, help='Number of lines in the test file', default=500000)
+    PARSER.add_argument('--single-line-mb', type=int, help='Size of the test file without newlines', default=100)
+    PARSER.add_argument('--dictionary-words', type=int, help='Number of words in the dictionary for --lang cjk', default=300000)
+    args = PARSER.parse_args()
+
+    path = make_file(args.lines)
+    try:
+        for name, unit, f in BENCHMARKS:
+            count, duration = timed(lambda: f(path))
+            print '{:20} {:12.0f} {}/s'.format(name, count / duration, unit)
+    finally:
+        os.unlink(path)
+
+    dictionary = make_dictionary(args.dictionary_words)
+    trie_handle, trie_path = tempfile.mkstemp()
+    latin_path = make_file(args.lines)
+    cjk_path = make_cjk_file(dictionary, args.lines / 10)
+    try:
+        _, duration = timed(lambda: speedread.segmentutils.PROFILES['cjk'](dictionary))
+        print '{:20} {:12.4f} s to build from a word list'.format('cjk dictionary', duration)
+
+        with os.fdopen(trie_handle, 'wb') as f:
+            with open(dictionary) as words:
+                f.write(speedread.trieutils.serialize(speedread.trieutils.read_word_list(words)))
+        _, duration = timed(lambda: speedread.segmentutils.PROFILES['cjk'](trie_path))
+        print '{:20} {:12.4f} s to open a trie file'.format('cjk dictionary', duration)
+
+        for lang in sorted(speedread.segmentutils.PROFILES):
+            line_to_words = speedread.segmentutils.PROFILES[lang](trie_path)
+            for text_name, text_path in [('latin', latin_path), ('cjk', cjk_path)]:
+                count, duration = timed(lambda: profile_words(text_path, line_to_words))
+                name = '--lang {} {}'.format(lang, text_name)
+                print '{:20} {:12.0f} words/s {:12.0f} bytes/s'.format(
+                    name, count / duration, os.path.getsize(text_path) / duration)
+    finally:
+        for path in (dictionary, trie_path, latin_path, cjk_path):
+            os.unlink(path)
+
+    path = make_single_line_file(args.single_line_mb)
+    try:
+        _, duration = timed(lambda: single_line_first_word(path))
+        print '{:20} {:12.4f} s to first word'.format('single line', duration)
+        count, duration = timed(lambda: single_line_words(path))
+        print '{:20} {:12.0f} words/s'.format('single line', count / duration)
+    finally:
+        os.unlink(path)
+
+if __name__ == '__main__':
+    main()
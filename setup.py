@@ -14,7 +14,7 @@ setup(
     author = "Tal Wrii",
     author_email = "talwrii@gmail.com",
     description = "Linux spritz-like reader for the command line",
-    install_requires=['blessings', 'readchar'],
+    install_requires=['blessings'],
     license = "BSD",
     keywords = "reading",
     packages=['speedread'],
@@ -1,54 +1,106 @@
 # Slowly reimplemnt bits of gevent/twisted/pygame until
 #   I get bored :/
+import heapq
+import itertools
 import threading
-import Queue
 import time
 
+class RealClock(object):
+    def time(self):
+        return time.time()
+
+    def wait(self, condition, timeout):
+        "Wait on a held condition for up to timeout. Returns False if nothing can wake us"
+        condition.wait(timeout)
+        return True
+
+class VirtualClock(object):
+    """A clock that jumps forward rather than waiting. Only
+    makes sense if everything happens on one thread. Things that
+    would have come from other threads can be scheduled"""
+    def __init__(self, start=0.):
+        self.now = start
+        self._events = []
+        self._event_ids = itertools.count()
+
+    def time(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+    def schedule(self, when, callback):
+        "Call callback when a wait reaches the time when"
+        heapq.heappush(self._events, (when, next(self._event_ids), callback))
+
+    def wait(self, condition, timeout):
+        if self._events and (timeout is None or self._events[0][0] <= self.now + timeout):
+            # Stand in for another thread that notifies us
+            when, _, callback = heapq.heappop(self._events)
+            self.now = max(self.now, when)
+            callback()
+            return True
+        elif timeout is None:
+            # Nobody else can notify us
+            return False
+        self.now += timeout
+        return True
+
 class Timer(object):
-    CLEAR = 'clear'
-    def __init__(self):
-        self.expired = threading.Event()
+    "Wait until the earliest of a number of expiry times"
+    def __init__(self, clock=None):
+        self.clock = clock or RealClock()
+        self.condition = threading.Condition()
         self.expires = []
-        self.q = Queue.Queue()
-
-    def expire_loop(self):
-        while True:
-            if self.expires:
-                timeout = min(self.expires) - time.time()
-            else:
-                timeout = None
-
-            try:
-                if timeout is None or timeout > 0:
-                    new_expires = self.q.get(timeout=timeout, block=True)
-                else:
-                    new_expires = None
-            except Queue.Empty:
-                pass
-
-            if new_expires is not None:
-                self.expires.append(new_expires)
-                self.expired.clear()
-
-            if new_expires == self.CLEAR:
-                self.expires = []
-                self.expired.clear()
-
-            if self.expires and (min(self.expires) < time.time()):
-                self.expired.set()
-                self.expires = []
 
     def set_delay(self, delay):
-        self.q.put(time.time() + delay)
+        with self.condition:
+            self.expires.append(self.clock.time() + delay)
+            self.condition.notify()
 
     def tick(self):
-        self.q.put(time.time())
+        "Expire now instead of at any other times"
+        with self.condition:
+            self.expires = [self.clock.time()]
+            self.condition.notify()
 
     def clear(self):
-        self.q.put(self.CLEAR)
+        with self.condition:
+            self.expires = []
+            self.condition.notify()
 
     def wait(self):
-        self.expired.wait()
+        "Wait for an expiry and then clear. Returns False if nothing will ever expire"
+        with self.condition:
+            while True:
+                now = self.clock.time()
+                if self.expires and min(self.expires) <= now:
+                    self.expires = []
+                    return True
+
+                timeout = min(self.expires) - now if self.expires else None
+                if not self.clock.wait(self.condition, timeout):
+                    return False
+
+class Mailbox(object):
+    "A queue with one slot. A new item replaces one that has not been got yet"
+    _EMPTY = object()
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.item = self._EMPTY
+
+    def put(self, item):
+        with self.condition:
+            self.item = item
+            self.condition.notify()
+
+    def get(self):
+        with self.condition:
+            while self.item is self._EMPTY:
+                self.condition.wait()
+            item, self.item = self.item, self._EMPTY
+            return item
 
 def spawn(f):
     t = threading.Thread(target=f)
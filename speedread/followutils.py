@@ -0,0 +1,181 @@
+"Wait for files that are still being written to (like tail -F)"
+import ctypes
+import ctypes.util
+import errno
+import fcntl
+import os
+import select
+import struct
+import threading
+import time
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class InotifyWatcher(object):
+    "Block until a file in a directory changes, using inotify through libc"
+
+    def __init__(self, fd, name):
+        self.fd = fd
+        self.name = name
+        # Writing to this pipe wakes wait up
+        self.wake_fd, self._wake_write_fd = os.pipe()
+        fcntl.fcntl(self._wake_write_fd, fcntl.F_SETFL, os.O_NONBLOCK)
+
+    @classmethod
+    def create(cls, path):
+        "Return a watcher for path or None if inotify is not available"
+        libc_name = ctypes.util.find_library('c')
+        if libc_name is None:
+            return None
+
+        try:
+            libc = ctypes.CDLL(libc_name, use_errno=True)
+            inotify_init = libc.inotify_init
+            inotify_add_watch = libc.inotify_add_watch
+        except (OSError, AttributeError):
+            return None
+
+        fd = inotify_init()
+        if fd < 0:
+            return None
+
+        # Watch the directory rather than the file so that we
+        #   still hear about a new file after rotation
+        directory, name = os.path.split(os.path.abspath(path))
+        if inotify_add_watch(fd, directory, WATCH_MASK) < 0:
+            os.close(fd)
+            return None
+
+        return cls(fd, name)
+
+    def wait(self, timeout):
+        "Wait until our file changes, wake is called or timeout expires. Returns True if something changed"
+        try:
+            readable, _, _ = select.select([self.fd, self.wake_fd], [], [], timeout)
+        except select.error as e:
+            if e.args[0] == errno.EINTR:
+                return False
+            raise
+
+        if self.wake_fd in readable:
+            os.read(self.wake_fd, 4096)
+            return True
+        elif not readable:
+            return False
+
+        data = os.read(self.fd, 4096)
+        return self.name in self.event_names(data)
+
+    def wake(self):
+        "Make wait return now (or straight away next time). Call from another thread"
+        try:
+            os.write(self._wake_write_fd, 'x')
+        except OSError as e:
+            # The pipe is full so wait will wake anyway
+            if e.errno != errno.EAGAIN:
+                raise
+
+    @staticmethod
+    def event_names(data):
+        names = []
+        pos = 0
+        while pos + EVENT_HEADER.size <= len(data):
+            _wd, _mask, _cookie, length = EVENT_HEADER.unpack_from(data, pos)
+            pos += EVENT_HEADER.size
+            names.append(data[pos:pos + length].rstrip('\0'))
+            pos += length
+        return names
+
+    def close(self):
+        for fd in (self.fd, self.wake_fd, self._wake_write_fd):
+            os.close(fd)
+
+
+class PollingWatcher(object):
+    "Block until a file changes by periodically calling stat"
+
+    def __init__(self, path, interval):
+        self.path = path
+        self.interval = interval
+        self.last_stat = self.stat_key()
+        self.woken = threading.Event()
+
+    def stat_key(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_dev, st.st_ino, st.st_size, st.st_mtime)
+
+    def wait(self, timeout):
+        end = time.time() + timeout
+        while True:
+            key = self.stat_key()
+            if key != self.last_stat or self.woken.is_set():
+                self.woken.clear()
+                self.last_stat = key
+                return True
+
+            remaining = end - time.time()
+            if remaining <= 0:
+                return False
+            self.woken.wait(min(self.interval, remaining))
+
+    def wake(self):
+        self.woken.set()
+
+    def close(self):
+        pass
+
+
+class Follower(object):
+    "Keep reading a file as it grows, is truncated or is replaced"
+
+    def __init__(self, path, timeout=5.0, poll_interval=0.25):
+        self.path = path
+        self.timeout = timeout
+        self.watcher = InotifyWatcher.create(path) or PollingWatcher(path, poll_interval)
+
+    def wait(self):
+        "Block until the file might have changed"
+        # The timeout guards against events that we miss
+        #   (e.g. on network filesystems)
+        self.watcher.wait(self.timeout)
+
+    def wake(self):
+        "Make wait return now, or straight away next time if we are not waiting"
+        self.watcher.wake()
+
+    def check(self, stream):
+        "Return a stream to carry on reading from. Call this at the end of stream"
+        try:
+            path_stat = os.stat(self.path)
+        except OSError:
+            # Part way through rotation
+            return stream
+
+        stream_stat = os.fstat(stream.fileno())
+        if (path_stat.st_dev, path_stat.st_ino) != (stream_stat.st_dev, stream_stat.st_ino):
+            # Rotated - we have already read everything in the old file
+            stream.close()
+            return open(self.path)
+        elif path_stat.st_size < stream.tell():
+            # Truncated
+            stream.seek(0)
+            return stream
+        else:
+            return stream
+
+    def close(self):
+        self.watcher.close()
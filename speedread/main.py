@@ -2,17 +2,18 @@
 # encoding: utf8
 import argparse
 import collections
+import functools
+import itertools
 import math
-import Queue
 import sys
 import threading
-import time
 
 import blessings
-import readchar
 
-from . import contextutils
+from . import followutils
 from . import seeksearch
+from . import segmentutils
+from . import streamutils
 from . import termutils
 from . import textutils
 from .textutils import WORD_TYPE, WordInfo
@@ -32,40 +33,61 @@ def main():
     PARSER.add_argument('--no-clear', action='store_true', help='Do not clear any printing (for debugging)', default=False)
     PARSER.add_argument('--no-controls', action='store_true', help='Switch off keyboard controls ', default=False)
     PARSER.add_argument('--offset', type=int, help='Start reading rom a character offset', default=0)
-    PARSER.add_argument('--script', type=str, help='Carry out a sequence of commands (e.g. for testing)', default=None)
+    PARSER.add_argument('--script', type=str, help='Carry out a sequence of commands (e.g. for testing). With --simulate keys are pressed a word period apart during playback and . waits', default=None)
+    PARSER.add_argument('--follow', '-f', action='store_true', help='Wait for more text at the end of the file (like tail -f)', default=False)
+    PARSER.add_argument('--simulate', action='store_true', help='Use a simulated clock and print each word with its time (e.g. with --script for testing)', default=False)
+    PARSER.add_argument('--lang', type=str, choices=sorted(segmentutils.PROFILES), help='How to split text into words. cjk splits Chinese and Japanese using --dictionary', default='latin')
+    PARSER.add_argument('--dictionary', type=str, help='Word list (or trie file from python -m speedread.trieutils) for --lang cjk', default=None)
 
     PARSER.add_argument('filename', type=str, help='Speed of output in words per minute')
     args = PARSER.parse_args()
 
     stream = open(args.filename)
     with stream as f:
-        reader = Reader(f)
+        follower = followutils.Follower(args.filename) if args.follow else None
+        line_to_words = segmentutils.PROFILES[args.lang](args.dictionary)
+        reader = Reader(f, follower=follower, line_to_words=line_to_words)
         term = blessings.Terminal()
 
-        if args.no_clear:
-            writer = termutils.NonclearingWriter(sys.stdout)
+        if args.simulate:
+            clock = asyncutils.VirtualClock()
+            display = TimestampDisplay(sys.stdout, clock)
         else:
-            writer = termutils.ClearingWriter(sys.stdout, term)
+            clock = asyncutils.RealClock()
+            if args.no_clear:
+                writer = termutils.NonclearingWriter(sys.stdout)
+            else:
+                writer = termutils.ClearingWriter(sys.stdout, term)
 
-        display = Display(term, writer)
+            display = Display(term, writer)
+            asyncutils.spawn(display.run)
 
         playing = not args.script
 
-        pusher = Pusher(reader, display, 60. / args.wpm, playing=playing)
+        pusher = Pusher(reader, display, 60. / args.wpm, playing=playing, clock=clock)
 
         controller = Controller(pusher, display)
 
-        pusher.seek(args.offset)
+        if args.offset:
+            pusher.seek(args.offset)
 
-        if args.no_controls:
+        if args.simulate:
+            # Everything happens on this thread
+            controller.schedule_script(args.script)
             pusher.run()
+        elif args.no_controls:
+            pusher.run(stop_at_end=True)
+            display.flush()
         else:
             asyncutils.spawn(pusher.run)
-            controller.run(script=args.script)
+            with termutils.RawKeyboard(sys.stdin) as keyboard:
+                controller.run(keyboard, script=args.script)
 
 def format_keybinding(c):
     alphabet = "abcdefghijklmnopqrstuvwxyz"
-    if ord(c) in range(1, 27):
+    if c in termutils.KEY_NAMES:
+        return termutils.KEY_NAMES[c]
+    elif ord(c) in range(1, 27):
         return "C-" + alphabet[ord(c) - 1]
     else:
         return c
@@ -79,9 +101,15 @@ class Controller(object):
         's': cls.show_sentence,
         'b': cls.back_sentence,
         'f': cls.forward_sentence,
+        termutils.KEY_LEFT: cls.back_sentence,
+        termutils.KEY_RIGHT: cls.forward_sentence,
         'w': cls.forward_word,
+        '\x0f': cls.jump_back,
+        '\t': cls.jump_forward,
         'j': cls.speed_up,
         'k': cls.slow_down,
+        termutils.KEY_UP: cls.speed_up,
+        termutils.KEY_DOWN: cls.slow_down,
         'h': cls.show_bindings,
         'l': cls.show_position,
         ' ': cls.pause,
@@ -116,18 +144,28 @@ class Controller(object):
         "Move forward a sentence"
         self.pusher.forward_sentence()
 
+    def jump_back(self):
+        "Go back to where we jumped from"
+        self.pusher.jump_back()
+
+    def jump_forward(self):
+        "Go forward to where we jumped back from"
+        self.pusher.jump_forward()
+
     def __init__(self, pusher, display):
         self.pusher = pusher
         self.display = display
+        self.clock = pusher.clock
         self.back_pressed_time = None
 
     def back_sentence(self):
         "Move to the previous sentene"
-        if self.back_pressed_time and time.time() - self.back_pressed_time < 0.5:
+        now = self.clock.time()
+        if self.back_pressed_time is not None and now - self.back_pressed_time < 0.5:
             self.pusher.back_two_sentences()
             self.back_pressed_time = None
         else:
-            self.back_pressed_time = time.time()
+            self.back_pressed_time = now
             self.pusher.back_sentence()
 
     def show_bindings(self):
@@ -140,15 +178,29 @@ class Controller(object):
             result.append("{} - {}".format(format_keybinding(key), value.__doc__))
         return '\n'.join(result)
 
-    def run(self, script=None):
-        self.display.set_wpm(60 / self.pusher.word_period)
-
-        if script:
-            for key in script:
-                self.handle_key(key)
+    def run(self, keyboard, script=None):
+        self.run_script(script)
 
         while True:
-            self.handle_key(readchar.readchar())
+            key = keyboard.read_key()
+            if key is None:
+                # End of input
+                return
+            self.handle_key(key)
+
+    def run_script(self, script):
+        self.display.set_wpm(60 / self.pusher.word_period)
+        for key in script_keys(script):
+            self.handle_key(key)
+
+    def schedule_script(self, script):
+        "Press the keys in script a word period apart on a VirtualClock while playing"
+        self.display.set_wpm(60 / self.pusher.word_period)
+        when = self.clock.time()
+        for key in script_keys(script):
+            when += self.pusher.word_period
+            if key != SCRIPT_WAIT:
+                self.clock.schedule(when, functools.partial(self.handle_key, key))
 
     def handle_key(self, char):
         commands = self.commands()
@@ -167,36 +219,99 @@ class Controller(object):
         self.pusher.word_period /= 0.9
         self.display.set_wpm(60/self.pusher.word_period)
 
+# Does nothing for a word period in a simulated script
+SCRIPT_WAIT = '.'
+
+def script_keys(script):
+    if not script:
+        return []
+    keys, rest = termutils.split_keys(script)
+    return keys + ([rest] if rest else [])
+
+WordFrame = collections.namedtuple('WordFrame', 'word wpm upcoming')
+
 class Display(object):
+    "Show words and text. Terminal output happens in run on its own thread"
+    PRERENDER_COUNT = 5
+
     def __init__(self, term, writer):
-        self.q = Queue.Queue()
+        self.mailbox = asyncutils.Mailbox()
+        self.texts = collections.deque()
         self.focus_column = 10
         self.term = term
         self.writer = writer
-        self.word_display = None
         self.wpm = '?'
+        self.last_frame = None
+        self.rendered = threading.Condition()
+        self.rendered_frame = None
+
+        # Only used by the render thread
+        self.clear = ''
+        self.prerendered = dict()
 
     def set_wpm(self, wpm):
         self.wpm = '{:.0f}'.format(wpm)
 
-    def display_word(self, word):
-        if self.word_display is not None:
-            self.word_display.exit()
-
-        marker_line = self.format_insert_line(self.focus_column)
-        word_line = self.format_word_line(self.focus_column, word)
-
-        self.word_display = contextutils.WithContext(self.writer.write(marker_line + '\n' + word_line + '\n'))
-        self.word_display.enter()
+    def display_word(self, word, upcoming=()):
+        self.last_frame = WordFrame(word=word, wpm=self.wpm, upcoming=tuple(upcoming))
+        self.mailbox.put(self.last_frame)
 
     def write_text(self, text):
-        if self.word_display is not None:
-            self.word_display.exit()
+        # Text must not be dropped so it does not go in the mailbox
+        self.texts.append(text)
+        # ... but we redraw the current word below it
+        self.mailbox.put(self.last_frame)
 
-        print text
+    def run(self):
+        while True:
+            frame = self.mailbox.get()
+            self.render(frame)
+            if frame is not None:
+                self.prerender(frame)
+
+    def render(self, frame):
+        "Write out any text and then frame in one go"
+        output = [self.clear]
+        self.clear = ''
+
+        while self.texts:
+            text_output, _clear = self.writer.render(self.texts.popleft() + '\n')
+            output.append(text_output)
+
+        if frame is not None:
+            frame_output, self.clear = self.format_frame(frame.word, frame.wpm)
+            output.append(frame_output)
+
+        self.writer.write_rendered(''.join(output))
+
+        with self.rendered:
+            self.rendered_frame = frame
+            self.rendered.notify_all()
+
+    def flush(self):
+        "Wait until the render thread has written everything"
+        with self.rendered:
+            while self.texts or self.rendered_frame is not self.last_frame:
+                self.rendered.wait()
+
+    def prerender(self, frame):
+        "Format the next few words so that showing them is just a write"
+        self.prerendered = dict(
+            ((word, frame.wpm), self.format_frame(word, frame.wpm))
+            for word in frame.upcoming[:self.PRERENDER_COUNT])
+
+    def format_frame(self, word, wpm):
+        "Return bytes to show word and bytes to clear it again"
+        prerendered = self.prerendered.get((word, wpm))
+        if prerendered is not None:
+            return prerendered
+
+        marker_line = self.format_insert_line(self.focus_column, wpm)
+        word_line = self.format_word_line(self.focus_column, word)
+        return self.writer.render(marker_line + '\n' + word_line + '\n')
 
-    def format_insert_line(self, focus_column):
-        return ' ' * (focus_column) + 'v' + ' ' + self.wpm
+    def format_insert_line(self, focus_column, wpm):
+        return ' ' * (focus_column) + 'v' + ' ' + wpm
 
     def format_word_line(self, focus_column, word):
         term = self.term
@@ -204,29 +319,67 @@ class Display(object):
         space = ''.join([' '] * (focus_column - focus_char))
         return termutils.DecoratedText(term, [space, word[:focus_char], (term.bold, word[focus_char]), word[focus_char + 1:]])
 
+class TimestampDisplay(object):
+    "A drop in replacement for Display that writes a line with the time for each word"
+    def __init__(self, stream, clock):
+        self.stream = stream
+        self.clock = clock
+
+    def set_wpm(self, wpm):
+        pass
+
+    def display_word(self, word, upcoming=()):
+        self.stream.write(u'{:.3f} {}\n'.format(self.clock.time(), word).encode('utf8'))
+
+    def write_text(self, text):
+        self.stream.write(u'{}\n'.format(text).encode('utf8'))
+
 class Pusher(object):
-    def __init__(self, reader, display, word_period, playing=True):
+    def __init__(self, reader, display, word_period, playing=True, clock=None):
         self.reader = reader
         self.display = display
         self.word_period = word_period
         self.lock = threading.RLock()
         self.playing = playing
-        self.timer = asyncutils.Timer()
+        self.clock = clock or asyncutils.RealClock()
+        self.timer = asyncutils.Timer(self.clock)
+        self.jumps = JumpList()
 
     def back_sentence(self):
         with self.lock:
+            self.jumps.record(self.reader.snapshot())
             self.reader.forward_sentence(reverse=True)
-            self.timer.tick()
+            self._wake()
 
     def back_two_sentences(self):
         with self.lock:
+            # The first press recorded where we were
             self.reader.forward_sentence(reverse=True, count=2)
-            self.timer.tick()
+            self._wake()
 
     def forward_sentence(self):
         with self.lock:
+            self.jumps.record(self.reader.snapshot())
             self.reader.forward_sentence()
-            self.timer.tick()
+            self._wake()
+
+    def jump_back(self):
+        with self.lock:
+            self._restore(self.jumps.back(self.reader.snapshot()))
+
+    def jump_forward(self):
+        with self.lock:
+            self._restore(self.jumps.forward(self.reader.snapshot()))
+
+    def _restore(self, snapshot):
+        if snapshot is not None:
+            self.reader.restore(snapshot)
+            self._wake()
+
+    def _wake(self):
+        "Show the next word now, even if we are waiting for a followed file to grow"
+        self.timer.tick()
+        self.reader.wake()
 
     def show_position(self):
         with self.lock:
@@ -234,11 +387,13 @@ class Pusher(object):
 
     def forward_word(self):
         with self.lock:
-            self.timer.tick()
+            self._wake()
 
     def show_sentence(self):
         with self.lock:
-            self.display.write_text(self.reader.current_sentence())
+            sentence = self.reader.current_sentence()
+            if sentence is not None:
+                self.display.write_text(sentence)
 
     def show_paragraph(self):
         with self.lock:
@@ -250,39 +405,55 @@ class Pusher(object):
 
     def seek(self, offset):
         with self.lock:
+            self.jumps.record(self.reader.snapshot())
             self.reader.seek(offset)
 
     def toggle_pause(self):
         with self.lock:
             self.playing = not self.playing
             if self.playing:
-                self.timer.tick()
+                self._wake()
             else:
                 self.timer.clear()
 
-    def run(self):
-        asyncutils.spawn(self.timer.expire_loop)
+    def run(self, stop_at_end=False):
+        "Show words until nothing else can happen (only with a VirtualClock) or the end if stop_at_end"
         while True:
-            with self.lock:
-                word_info = self.reader.get_word()
-                if word_info is None:
-                    return
-                else:
-                    self.display.display_word(word_info.word + (word_info.sep if word_info.sep and word_info.sep.strip() else ''))
+            word_info = self.step()
+            if word_info is None:
+                # Following a file and we have caught up with
+                #   the writer. Don't hold the lock while we wait
+                self.reader.wait_for_data()
+                continue
 
-                delay = Speedread.word_multiple(word_info.type, word_info.word) * self.word_period
+            if stop_at_end and word_info.type == WORD_TYPE.END_OF_FILE:
+                return
 
-                if self.playing:
-                    self.timer.set_delay(delay)
+            if not self.timer.wait():
+                return
 
-            self.timer.wait()
-
-            with self.lock:
+    def step(self):
+        "Show the next word and start timing it. Returns the word"
+        with self.lock:
+            word_info = self.reader.get_word()
+            if word_info is not None:
+                # Any expiry that is still pending was for an earlier word
                 self.timer.clear()
+                upcoming = self.reader.upcoming_words(Display.PRERENDER_COUNT)
+                self.display.display_word(display_text(word_info), [display_text(w) for w in upcoming])
+
+                # Stay on the end until the user moves
+                if self.playing and word_info.type != WORD_TYPE.END_OF_FILE:
+                    self.timer.set_delay(Speedread.word_multiple(word_info.type, word_info.word) * self.word_period)
+
+            return word_info
 
 class Reader(object):
-    def __init__(self, stream):
+    def __init__(self, stream, follower=None, line_to_words=textutils.line_to_words):
         self.stream = stream
+        self.lines = streamutils.BlockLineReader(stream)
+        self.follower = follower
+        self.line_to_words = line_to_words
         self._read_ahead_words = collections.deque()
         self.word_classifier = textutils.WordClassifier()
         self.sentence_tracker = SentenceTracker()
@@ -290,40 +461,101 @@ class Reader(object):
         self.displayed_word_id = 0
         self.preceeding_empty_line = False
         self.last_line_leftover = ''
+        self.last_line_continues = False
         self.last_word = None
 
     def forward_sentence(self, count=1, reverse=False):
         with seeksearch.save_excursion(self.stream):
             # Go to our current position in the file
             self.stream.seek(self.character_offset())
-            index = seeksearch.seek_find(self.stream, '.', count=count, reverse=reverse)
+            index = seeksearch.seek_find_sentence(self.stream, count=count, reverse=reverse)
 
         if index != -1:
             self.flush_cache()
-            self.stream.seek(index + 1)
+            self.lines.seek(index)
 
     def flush_cache(self):
         self._read_ahead_words = collections.deque()
         self.read_word_id = 0
         self.sentence_tracker.reset()
         self.last_line_leftover = ''
+        self.last_line_continues = False
 
     def seek(self, offset):
-        self.stream.seek(offset)
+        self.lines.seek(offset)
         self.flush_cache()
 
+    def snapshot(self):
+        "Save enough state to carry on reading from here without rereading"
+        while not self._read_ahead_words:
+            if not self.read_line():
+                break
+
+        words = list(itertools.islice(self._read_ahead_words, SNAPSHOT_WORDS))
+        snapshot = ReaderSnapshot(
+            words=words,
+            line_offset=self.lines.tell(),
+            last_line_leftover=self.last_line_leftover,
+            last_line_continues=self.last_line_continues,
+            last_word=self.last_word,
+            last_word_type=self.word_classifier.last_word_type,
+            read_word_id=self.read_word_id,
+            displayed_word_id=self.displayed_word_id,
+            sentences=self.sentence_tracker.snapshot())
+
+        if len(words) < len(self._read_ahead_words):
+            # Keep the snapshot small by carrying on reading from
+            #   the next word. Stop after a sentence end if we can
+            ends = [i for i, word in enumerate(words) if word.type == WORD_TYPE.SENTENCE_END]
+            if ends:
+                words = words[:ends[-1] + 1]
+                unfinished = []
+            else:
+                unfinished = [self.sentence_tracker.text_before(self._read_ahead_words)]
+                for word in words:
+                    unfinished.extend(SentenceTracker.word_parts(word))
+
+            last = words[-1]
+            snapshot = snapshot._replace(
+                words=words,
+                line_offset=self._read_ahead_words[len(words)].offset,
+                last_line_leftover='',
+                last_line_continues=False,
+                last_word=last,
+                last_word_type=last.type,
+                read_word_id=last.id + 1,
+                sentences=self.sentence_tracker.snapshot(last.id, unfinished))
+
+        return snapshot
+
+    def restore(self, snapshot):
+        "Go back to a snapshot. Does not read anything until its words run out"
+        self.lines.seek(snapshot.line_offset)
+        self._read_ahead_words = collections.deque(snapshot.words)
+        self.last_line_leftover = snapshot.last_line_leftover
+        self.last_line_continues = snapshot.last_line_continues
+        self.last_word = snapshot.last_word
+        self.word_classifier.last_word_type = snapshot.last_word_type
+        self.read_word_id = snapshot.read_word_id
+        self.displayed_word_id = snapshot.displayed_word_id
+        self.sentence_tracker.restore(snapshot.sentences)
+
     def current_sentence(self):
+        "The sentence being displayed. Only what we have so far at the end of the file, or None"
         while True:
             sentence = self.sentence_tracker.get_sentence(self.displayed_word_id)
             if sentence:
                 return sentence
-            self.read_line()
+
+            at_end = self.last_word is not None and self.last_word.type == WORD_TYPE.END_OF_FILE
+            if at_end or not self.read_line():
+                return self.sentence_tracker.unfinished_sentence()
 
     def character_offset(self):
         if self._read_ahead_words:
             return self._read_ahead_words[0].offset
         else:
-            return self.stream.tell()
+            return self.lines.tell()
 
     def current_paragraph(self):
         while True:
@@ -332,12 +564,66 @@ class Reader(object):
                 return paragraph
 
     def read_line(self):
-        line_offset = self.stream.tell()
-        line = self.stream.readline().decode('utf8')
-        self.last_line_leftover = self.process_line(self.process_word, line_offset, self.last_line_leftover, line)
+        "Read words from the next line. Returns False if we are following and nothing has been written yet"
+        line_offset = self.lines.tell()
+        line = self.lines.readline()
+        if self.follower is not None and not line.endswith('\n') and not self.lines.line_continues:
+            return self.follow_end_of_data(line_offset)
+
+        continues_line, self.last_line_continues = self.last_line_continues, self.lines.line_continues
+        if continues_line and line and not line.strip():
+            # The spaces at the end of a long line
+            #   rather than a blank line
+            if self.last_line_leftover:
+                self.flush_leftover(line_offset)
+            return True
+
+        self.last_line_leftover = self.process_line(self.process_word, self.line_to_words, line_offset, self.last_line_leftover, line)
+        if len(self.last_line_leftover) > self.lines.max_line_length:
+            # One enormous word. Show it in pieces rather
+            #   than holding all of it in memory
+            self.flush_leftover(self.lines.tell())
+        return True
+
+    def flush_leftover(self, end_offset):
+        "Treat what was left over from the last line as a word that ends at end_offset"
+        left_over = self.last_line_leftover
+        self.last_line_leftover = ''
+        word = left_over.rstrip()
+        sep = left_over[len(word):] or None
+        self.process_word(WordInfo(word=word, type=WORD_TYPE.UNKNOWN, offset=end_offset - utf8len(left_over), id=None, sep=sep))
+
+    def follow_end_of_data(self, line_offset):
+        # The writer may be part way through a line so
+        #   leave it for later
+        self.lines.seek(line_offset)
+
+        if self.last_line_leftover:
+            # Nothing follows the last word yet. Show it now
+            #   rather than waiting for the next line
+            self.flush_leftover(line_offset)
+            return True
+
+        stream = self.follower.check(self.stream)
+        if stream is not self.stream or stream.tell() != line_offset:
+            # Rotated or truncated
+            self.stream = stream
+            self.lines = streamutils.BlockLineReader(stream)
+            self.last_line_leftover = ''
+            return True
+
+        return False
+
+    def wait_for_data(self):
+        self.follower.wait()
+
+    def wake(self):
+        "Stop wait_for_data waiting (e.g. because we have moved)"
+        if self.follower is not None:
+            self.follower.wake()
 
     @classmethod
-    def process_line(cls, process_word, offset, left_over, line):
+    def process_line(cls, process_word, line_to_words, offset, left_over, line):
         "Split a line into words and call process_word on each word"
         line_empty = not line.strip()
 
@@ -346,11 +632,13 @@ class Reader(object):
             if line_empty:
                 # Missing full stop - treat this
                 #   as a paragraph end
-                process_word(WordInfo(word=left_over, type=WORD_TYPE.PARAGRAPH_END, offset=offset - utf8len(left_over + line), id=None, sep=None))
-                return cls.process_line(process_word, offset, '', line)
+                process_word(WordInfo(word=left_over.strip(), type=WORD_TYPE.PARAGRAPH_END, offset=offset - utf8len(left_over), id=None, sep=None))
+                return cls.process_line(process_word, line_to_words, offset, '', line)
             else:
-                # Normal line continuation
-                return cls.process_line(process_word, offset - utf8len(left_over), '', left_over.strip() + ' ' + line)
+                # Normal line continuation. Replace the newline with
+                #   spaces so that offsets still line up
+                word = left_over.rstrip()
+                return cls.process_line(process_word, line_to_words, offset - utf8len(left_over), '', word + ' ' * (len(left_over) - len(word)) + line)
         else:
             if not line: #eof
                 process_word(END_OF_FILE._replace(offset=offset))
@@ -359,7 +647,7 @@ class Reader(object):
                 process_word(PARAGRAPH._replace(offset=offset))
                 return ''
             else:
-                words, left_over = textutils.line_to_words(line)
+                words, left_over = line_to_words(line)
                 for word in words:
                     process_word(word._replace(offset=offset + word.offset))
                 return left_over
@@ -380,28 +668,83 @@ class Reader(object):
 
         self.last_word = word_info
 
+    def upcoming_words(self, count):
+        "The next few words that we have already read"
+        return list(itertools.islice(self._read_ahead_words, count))
+
     def get_word(self):
+        "Get the next word. Returns None if we are following and there is nothing new"
         while not self._read_ahead_words:
-            self.read_line()
+            if not self.read_line():
+                return None
         word_info = self._read_ahead_words.popleft()
         self.displayed_word_id = word_info.id
         self.sentence_tracker.word_displayed(word_info)
 
         return word_info
 
+# Words to keep in each ReaderSnapshot (roughly)
+SNAPSHOT_WORDS = 100
+
+ReaderSnapshot = collections.namedtuple('ReaderSnapshot', 'words line_offset last_line_leftover last_line_continues last_word last_word_type read_word_id displayed_word_id sentences')
+
+class JumpList(object):
+    "Places that we have jumped from, like vim's jump list"
+    def __init__(self, size=50):
+        self.size = size
+        self.entries = []
+        # Where we are in entries. len(entries) if we
+        #   have not gone back
+        self.index = 0
+
+    def record(self, entry):
+        "We are jumping away from entry"
+        del self.entries[self.index:]
+        self.entries.append(entry)
+        del self.entries[:-self.size]
+        self.index = len(self.entries)
+
+    def back(self, current):
+        "Return the entry to go back to, or None. current is where we are now"
+        if self.index == 0:
+            return None
+        self._save(current)
+        self.index -= 1
+        return self.entries[self.index]
+
+    def forward(self, current):
+        "Return the entry to go forward to, or None"
+        if self.index >= len(self.entries) - 1:
+            return None
+        self._save(current)
+        self.index += 1
+        return self.entries[self.index]
+
+    def _save(self, current):
+        # Remember where we are so we can come back
+        if self.index == len(self.entries):
+            self.entries.append(current)
+        else:
+            self.entries[self.index] = current
+
 class SentenceTracker(object):
     "Keep track of sentences that we have read but not yet displayed"
     def __init__(self):
         self._sentences_by_last_id = dict()
         self._current_sentence_parts = []
 
-    def read_ahead_word(self, word_info):
-        if word_info.type == WORD_TYPE.PARAGRAPH:
-            return
+    @staticmethod
+    def word_parts(word_info):
+        "What word_info adds to the text of its sentence"
+        if word_info.type in (WORD_TYPE.PARAGRAPH, WORD_TYPE.END_OF_FILE):
+            return []
+        elif word_info.sep:
+            return [word_info.word, word_info.sep]
+        else:
+            return [word_info.word]
 
-        self._current_sentence_parts.append(word_info.word)
-        if word_info.sep:
-            self._current_sentence_parts.append(word_info.sep)
+    def read_ahead_word(self, word_info):
+        self._current_sentence_parts.extend(self.word_parts(word_info))
 
         if word_info.type == WORD_TYPE.SENTENCE_END:
             sentence = ''.join(self._current_sentence_parts)
@@ -414,12 +757,42 @@ class SentenceTracker(object):
 
     def reset(self):
         self._sentences_by_last_id = dict()
+        self._current_sentence_parts = []
+
+    def snapshot(self, last_id=None, unfinished=()):
+        "Our state, or our state just after reading the word with id last_id given the parts of the sentence it is in"
+        if last_id is None:
+            return dict(self._sentences_by_last_id), list(self._current_sentence_parts)
+        else:
+            sentences = dict((end_id, sentence) for end_id, sentence in self._sentences_by_last_id.items() if end_id <= last_id)
+            return sentences, list(unfinished)
+
+    def text_before(self, words):
+        "The text of the sentence that words (which we have read ahead) start part way through"
+        parts = []
+        for word in words:
+            parts.extend(self.word_parts(word))
+            if word.type == WORD_TYPE.SENTENCE_END:
+                sentence = self._sentences_by_last_id[word.id]
+                break
+        else:
+            sentence = ''.join(self._current_sentence_parts)
+        return sentence[:len(sentence) - len(''.join(parts))]
+
+    def restore(self, snapshot):
+        sentences, parts = snapshot
+        self._sentences_by_last_id = dict(sentences)
+        self._current_sentence_parts = list(parts)
 
     def get_sentence(self, word_id):
         for end_id, sentence in sorted(self._sentences_by_last_id.items()):
             if end_id > word_id:
                 return sentence
 
+    def unfinished_sentence(self):
+        "What we have read of a sentence without an end, or None"
+        return ''.join(self._current_sentence_parts).strip() or None
+
 class Speedread(object):
     "Purish logic related to the algorithm"
     @staticmethod
@@ -442,6 +815,10 @@ class Speedread(object):
         }[word_type]
 
 
+def display_text(word_info):
+    "The text to show for a word"
+    return word_info.word + (word_info.sep if word_info.sep and word_info.sep.strip() else '')
+
 def utf8len(string):
     return len(string.encode('utf8'))
 
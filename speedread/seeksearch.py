@@ -1,6 +1,19 @@
 import argparse
 import itertools
 import contextlib
+import re
+
+from . import textutils
+
+# Separators (in utf8) or blank lines. Separators are only boundaries
+#   if textutils.ends_sentence says so or a blank line follows them.
+#   Trailing whitespace (and the end of the line) is part of the boundary
+#   so that it ends where the next word starts
+SENTENCE_BOUNDARY_RE = re.compile(
+    '(?:({})([ \t\r]*\n(?:[ \t\r]*\n)+)?|\n(?:[ \t\r]*\n)+)[ \t\r]*(?:\n[ \t\r]*)?'.format(textutils.SEPARATOR_RE.encode('utf8')))
+
+# How much text either side of a boundary we need to look at
+BOUNDARY_CONTEXT = 64
 
 
 def read_chunks(stream, size, overlap):
@@ -55,6 +68,91 @@ def seek_find(stream, needle, chunk_size=1000, count=1, reverse=False):
     else:
         return -1
 
+def iter_sentence_boundaries(stream, chunk_size=1000):
+    "Offsets just after each sentence boundary after the stream's position, in order"
+    start = stream.tell()
+    buf_start = max(start - BOUNDARY_CONTEXT, 0)
+    stream.seek(buf_start)
+    buf = ''
+    # Where to carry on searching from in buf
+    pos = start - buf_start
+    while True:
+        chunk = stream.read(chunk_size)
+        buf += chunk
+        # Matches near the end of buf might change once we read more
+        safe_end = len(buf) - BOUNDARY_CONTEXT if chunk else len(buf)
+
+        for match in SENTENCE_BOUNDARY_RE.finditer(buf, pos):
+            if match.end() > safe_end:
+                break
+            pos = match.end()
+            # No sentence starts at the end of the file
+            if is_sentence_boundary(buf, match) and (chunk or match.end() < len(buf)):
+                yield buf_start + match.end()
+        else:
+            pos = max(pos, safe_end)
+
+        if not chunk:
+            return
+
+        drop = max(pos - BOUNDARY_CONTEXT, 0)
+        buf = buf[drop:]
+        buf_start += drop
+        pos -= drop
+
+def riter_sentence_boundaries(stream, chunk_size=1000):
+    "Offsets just after each sentence boundary before the stream's position, latest first"
+    end = stream.tell()
+    buf = stream.read(BOUNDARY_CONTEXT)
+    buf_start = end
+    # No sentence starts at the end of the file
+    latest = end if buf else end - 1
+    # Only consider matches starting before here
+    upper = end
+    while buf_start > 0:
+        chunk_start = max(buf_start - chunk_size, 0)
+        stream.seek(chunk_start)
+        buf = stream.read(buf_start - chunk_start) + buf
+        buf_start = chunk_start
+
+        # Matches too near the start of buf need more context
+        lower = buf_start + BOUNDARY_CONTEXT if buf_start > 0 else 0
+
+        boundaries = []
+        # Keep the context for matches we have not looked at yet
+        #   including all of a match that starts before lower
+        keep = 2 * BOUNDARY_CONTEXT
+        for match in SENTENCE_BOUNDARY_RE.finditer(buf):
+            if buf_start + match.start() < lower:
+                keep = max(keep, match.end() + BOUNDARY_CONTEXT)
+            elif buf_start + match.start() < upper and buf_start + match.end() <= latest:
+                if is_sentence_boundary(buf, match):
+                    boundaries.append(buf_start + match.end())
+        for boundary in reversed(boundaries):
+            yield boundary
+
+        upper = lower
+        buf = buf[:keep]
+
+    # The start of the file starts a sentence
+    yield 0
+
+def is_sentence_boundary(buf, match):
+    sep, blank_lines = match.groups()
+    if sep is None or blank_lines is not None:
+        return True
+    before = buf[max(match.start() - BOUNDARY_CONTEXT, 0):match.start()]
+    return textutils.ends_sentence(before.decode('utf8', 'ignore'), sep.decode('utf8'))
+
+def seek_find_sentence(stream, chunk_size=1000, count=1, reverse=False):
+    "Find the offset after the count-th sentence boundary from the stream's position"
+    boundaries = riter_sentence_boundaries if reverse else iter_sentence_boundaries
+    for num_found, offset in enumerate(boundaries(stream, chunk_size), 1):
+        if num_found == count:
+            return offset
+    else:
+        return -1
+
 def search_string_forward(string, needle, start):
     if start is None:
         return string.find(needle)
@@ -0,0 +1,90 @@
+"Ways of splitting lines into words for different languages (see --lang)"
+import re
+
+from . import textutils
+from . import trieutils
+from .textutils import WORD_TYPE, WordInfo
+
+# Hiragana, katakana and CJK ideographs
+CJK_RE = re.compile(u'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+')
+
+
+class DictionarySegmenter(object):
+    """Split runs of CJK characters, which have no spaces between words,
+    into the longest words in a dictionary (or single characters if there
+    is no match). Everything else is split like latin text"""
+
+    def __init__(self, trie):
+        self.trie = trie
+
+    def line_to_words(self, line):
+        "Like textutils.line_to_words"
+        words, left_over = textutils.line_to_words(line)
+        if not CJK_RE.search(line):
+            return words, left_over
+
+        segmented = []
+        for word in words:
+            self.segment_word(segmented, word)
+
+        text = left_over.rstrip()
+        if text:
+            # Only the last word of what is left over
+            #   can carry on onto the next line
+            left_over_words = []
+            offset = utf8len(line) - utf8len(left_over)
+            self.segment_word(left_over_words, WordInfo(id=None, type=WORD_TYPE.UNKNOWN, word=text, sep=u'', offset=offset))
+            segmented.extend(left_over_words[:-1])
+            left_over = left_over_words[-1].word + left_over[len(text):]
+
+        return segmented, left_over
+
+    def segment_word(self, segmented, word_info):
+        "Add the words in word_info to segmented"
+        text = word_info.word
+        if not CJK_RE.search(text):
+            segmented.append(word_info)
+            return
+
+        longest_match = self.trie.longest_match
+        offset = word_info.offset
+        pos = 0
+        for match in CJK_RE.finditer(text):
+            run_start, run_end = match.span()
+            if run_start > pos:
+                piece = text[pos:run_start]
+                segmented.append(WordInfo(id=None, type=WORD_TYPE.UNKNOWN, word=piece, sep=u'', offset=offset))
+                offset += utf8len(piece)
+
+            pos = run_start
+            while pos < run_end:
+                end = longest_match(text, pos, run_end) or pos + 1
+                # An empty separator rather than None so that
+                #   WordClassifier still spots sentence beginnings
+                segmented.append(WordInfo(id=None, type=WORD_TYPE.UNKNOWN, word=text[pos:end], sep=u'', offset=offset))
+                # Everything that CJK_RE matches is three bytes in utf8
+                offset += 3 * (end - pos)
+                pos = end
+
+        if pos < len(text):
+            segmented.append(WordInfo(id=None, type=WORD_TYPE.UNKNOWN, word=text[pos:], sep=u'', offset=offset))
+
+        segmented[-1] = segmented[-1]._replace(sep=word_info.sep)
+
+
+def latin_profile(dictionary):
+    return textutils.line_to_words
+
+def cjk_profile(dictionary):
+    # Without a dictionary every character is a word
+    trie = trieutils.load(dictionary) if dictionary else trieutils.Trie.from_words([])
+    return DictionarySegmenter(trie).line_to_words
+
+# Functions from an optional dictionary file to a line_to_words function
+PROFILES = {
+    'latin': latin_profile,
+    'cjk': cjk_profile,
+}
+
+def utf8len(string):
+    return len(string.encode('utf8'))
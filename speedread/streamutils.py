@@ -0,0 +1,99 @@
+"Read from streams in large blocks"
+import itertools
+import re
+
+from . import textutils
+
+# Long lines are split after separators so that they split into
+#   the same words as they would whole
+SEPARATOR_BYTES_RE = re.compile(textutils.SEPARATOR_RE.encode('utf8'))
+
+
+class BlockLineReader(object):
+    """Read decoded lines out of a stream a block at a time. Byte
+    offsets are tracked arithmetically so tell does not touch the stream.
+
+    Lines longer than max_line_length are returned in pieces, split
+    after a space where possible. line_continues says whether the
+    last line returned was such a piece"""
+
+    def __init__(self, stream, block_size=256 * 1024, encoding='utf8', max_line_length=64 * 1024):
+        self.stream = stream
+        self.block_size = block_size
+        self.encoding = encoding
+        self.max_line_length = max_line_length
+        self.seek(stream.tell())
+
+    def seek(self, offset):
+        self.stream.seek(offset)
+        self.offset = offset
+        self.line_continues = False
+        self._lines = self._iter_lines()
+
+    def tell(self):
+        return self.offset
+
+    def readline(self):
+        "Like file.readline but returns unicode"
+        return self._lines.next()
+
+    def _iter_lines(self):
+        partial = ''
+        while True:
+            block = self.stream.read(self.block_size)
+            if not block:
+                # Like file.readline we return what we have
+                #   at the end of the stream and then ''
+                line, partial = partial, ''
+                self.offset += len(line)
+                self.line_continues = False
+                yield line.decode(self.encoding)
+                continue
+
+            # Newlines never occur inside a multibyte
+            #   character so we can decode up to the last one
+            #   in one go
+            lines, newline, partial = (partial + block).rpartition('\n')
+            if newline:
+                self.line_continues = False
+                raw_lines = lines.split('\n')
+                text_lines = lines.decode(self.encoding).split(u'\n')
+                for raw_line, text_line in itertools.izip(raw_lines, text_lines):
+                    self.offset += len(raw_line) + 1
+                    yield text_line + u'\n'
+
+            while len(partial) > self.max_line_length:
+                split = split_long_line(partial, self.max_line_length)
+                if split is None:
+                    break
+                piece, partial = split
+                self.offset += len(piece)
+                self.line_continues = True
+                yield piece.decode(self.encoding)
+
+def split_long_line(line, max_length):
+    """Split utf8 bytes at the start of the last word that starts before max_length,
+    or failing that between characters. Returns None if we need
+    more of the line to know where the word starts"""
+    cut = 0
+    # Usually there is a separator just before max_length so
+    #   only look at the whole line if there isn't
+    for start in (max(max_length - 256, 0), 0):
+        for match in SEPARATOR_BYTES_RE.finditer(line, start):
+            if match.start() >= max_length:
+                break
+            # Matches include the whole run of separators even
+            #   if we start looking part way through it
+            cut = match.end()
+        if cut or start == 0:
+            break
+
+    if cut == 0:
+        cut = max_length
+        # Don't split a multibyte character
+        while cut > 0 and 0x80 <= ord(line[cut]) < 0xc0:
+            cut -= 1
+    elif cut == len(line) and len(line) < 2 * max_length:
+        # The separators (or a decimal point) might carry on
+        return None
+    return line[:cut], line[cut:]
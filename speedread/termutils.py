@@ -1,5 +1,26 @@
-import contextlib
+import collections
+import errno
+import os
+import re
+import select
+import termios
 import time
+import tty
+
+KEY_UP = '\x1b[A'
+KEY_DOWN = '\x1b[B'
+KEY_RIGHT = '\x1b[C'
+KEY_LEFT = '\x1b[D'
+
+KEY_NAMES = {
+    KEY_UP: '<up>',
+    KEY_DOWN: '<down>',
+    KEY_RIGHT: '<right>',
+    KEY_LEFT: '<left>',
+}
+
+# CSI sequences (e.g. arrows), SS3 sequences (e.g. F1) and alt+key
+ESCAPE_SEQUENCE_RE = re.compile(r'\x1b(?:\[[0-?]*[ -/]*[@-~]|O[ -~]|[^\[O])')
 
 class DecoratedText(object):
     "A str-like object with blessings decoration. Supports partition and length"
@@ -45,12 +66,14 @@ class NonclearingWriter(object):
     def __init__(self, stream):
         self.stream = stream
 
-    @contextlib.contextmanager
-    def write(self, text):
-        # readchar switches off linefeeds (I think)
-        self.stream.write(unicode(text).replace('\n', '\r\n'))
+    def render(self, text):
+        "Return bytes to output text and bytes to clear it again"
+        # The keyboard puts the terminal in raw mode
+        return unicode(text).replace('\n', '\r\n').encode('utf8'), ''
+
+    def write_rendered(self, data):
+        self.stream.write(data)
         self.stream.flush()
-        yield
 
 class ClearingWriter(object):
     "An object to write to a stream, using the terminal escape codes to clear this output"
@@ -59,39 +82,118 @@ class ClearingWriter(object):
         self.term = term
         self.debug = debug
 
-    @contextlib.contextmanager
-    def write(self, text):
-        line, _sep, rest = text.partition('\n')
-        with self._write_line(line):
-            if rest:
-                with self.write(rest):
-                    yield
-            else:
-                yield
-
-    def _write(self, text):
-        self.stream.write(text.encode('utf8'))
+    def render(self, text):
+        "Return bytes to output text and bytes to clear it again"
+        output = []
+        clear = []
+        while True:
+            line, _sep, text = text.partition('\n')
+            output.append(self._render_line(line))
+            # Clear the last line first
+            clear.insert(0, self._render_clear_line(len(line)))
+            if not text:
+                break
+
+        return u''.join(output).encode('utf8'), u''.join(clear).encode('utf8')
+
+    def write_rendered(self, data):
+        self.stream.write(data)
+        self.stream.flush()
         if self.debug:
-            self.stream.flush(); time.sleep(1)
+            time.sleep(1)
 
-    @contextlib.contextmanager
-    def _write_line(self, line):
-        self._write(unicode(line))
-        self._write('\r\n') # readchar switches off carriage returns
+    def _render_line(self, line):
+        return unicode(line) + '\r\n' # The keyboard puts the terminal in raw mode
 
-        yield
-
-        line_length = len(line)
-
-        self._write(self.term.move_up)
-        for _ in xrange(line_length):
-            self._write(self.term.move_right)
-
-        for _ in xrange(line_length):
-            self._write(self.term.move_left)
-
-        for _ in xrange(line_length):
-            self._write(' ')
+    def _render_clear_line(self, line_length):
+        term = self.term
+        return (term.move_up
+            + term.move_right * line_length
+            + term.move_left * line_length
+            + ' ' * line_length
+            + term.move_left * line_length)
+
+class RawKeyboard(object):
+    """Read keys from a terminal. The terminal stays in raw mode
+    from __enter__ until __exit__ rather than for each key"""
+    # How long to wait for the rest of an escape sequence
+    #   before deciding that escape was pressed on its own
+    ESCAPE_TIMEOUT = 0.05
 
-        for _ in xrange(line_length):
-            self._write(self.term.move_left)
+    def __init__(self, stream):
+        self.fd = stream.fileno()
+        self.old_attributes = None
+        self.pending = ''
+        self.keys = collections.deque()
+
+    def __enter__(self):
+        if os.isatty(self.fd):
+            self.old_attributes = termios.tcgetattr(self.fd)
+            tty.setraw(self.fd)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.old_attributes is not None:
+            termios.tcsetattr(self.fd, termios.TCSADRAIN, self.old_attributes)
+            self.old_attributes = None
+
+    def read_key(self, timeout=None):
+        "Return the next key, or None on timeout or at the end of input"
+        while not self.keys:
+            if not self._wait(self.ESCAPE_TIMEOUT if self.pending else timeout):
+                if not self.pending:
+                    return None
+                # An incomplete sequence, probably escape on its own
+                self.keys.append(self.pending)
+                self.pending = ''
+                break
+
+            data = os.read(self.fd, 1024)
+            if not data:
+                return None
+
+            keys, self.pending = split_keys(self.pending + data)
+            self.keys.extend(keys)
+
+        return self.keys.popleft()
+
+    def _wait(self, timeout):
+        while True:
+            try:
+                readable, _, _ = select.select([self.fd], [], [], timeout)
+                return bool(readable)
+            except select.error as e:
+                # e.g. SIGWINCH when the terminal is resized
+                if e.args[0] != errno.EINTR:
+                    raise
+
+def split_keys(data):
+    "Split bytes from a terminal into keys. Returns the keys and an incomplete key"
+    keys = []
+    pos = 0
+    while pos < len(data):
+        if data[pos] == '\x1b':
+            match = ESCAPE_SEQUENCE_RE.match(data, pos)
+            if match is None:
+                break
+            key_end = match.end()
+        else:
+            key_end = pos + utf8_char_length(data[pos])
+            if key_end > len(data):
+                break
+
+        keys.append(data[pos:key_end])
+        pos = key_end
+
+    return keys, data[pos:]
+
+def utf8_char_length(first_byte):
+    code = ord(first_byte)
+    if code >= 0xf0:
+        return 4
+    elif code >= 0xe0:
+        return 3
+    elif code >= 0xc0:
+        return 2
+    else:
+        return 1
@@ -5,31 +5,75 @@ import collections
 
 WordInfo = collections.namedtuple('WordInfo', 'id type word sep offset')
 
+# Full stops between digits are decimal points rather than separators.
+#   This is also used on utf8 bytes by seeksearch so avoid
+#   non-ascii characters in character classes. The CJK characters are the
+#   ideographic comma, full stop and space and fullwidth , ! ? and ;
+SEPARATOR_RE = (u'(?:[, ;?!\\-]|\u2014|\u2026|\\.(?!\\d)|(?<!\\d)\\.'
+    u'|\u3001|\u3002|\u3000|\uff0c|\uff01|\uff1f|\uff1b)+')
+
+SENTENCE_END_CHARS = u'.?!\u2026\u3002\uff01\uff1f'
+
+# Sentence ends that can't be the end of an abbreviation
+CERTAIN_SENTENCE_END_CHARS = SENTENCE_END_CHARS.replace(u'.', u'')
+
+CLAUSE_END_CHARS = u',;\u3001\uff0c\uff1b'
+
+# Words that are usually followed by a full stop
+#   that does not end a sentence
+ABBREVIATIONS = frozenset([
+    'mr', 'mrs', 'ms', 'dr', 'prof', 'sr', 'jr', 'st', 'mt', 'vs', 'etc',
+    'cf', 'al', 'fig', 'vol', 'no', 'pp', 'inc', 'ltd', 'co', 'corp',
+    'jan', 'feb', 'mar', 'apr', 'jun', 'jul', 'aug', 'sep', 'sept', 'oct', 'nov', 'dec'])
+
+TRAILING_WORD_RE = re.compile(u'(\\w+)$', re.UNICODE)
+
+SEPARATOR_SPLIT_RE = re.compile(u'({})'.format(SEPARATOR_RE))
+
 def line_to_words(line):
-    "Split a line into words"
-    word_offset = 0
-    words = []
+    """Split a line into words. Also returns what is left over after
+    the last separator (including any newline) which may continue on the next line"""
     if line.strip() == '':
         return [], ''
+
+    # Alternating words and separators, then what is left over
+    parts = SEPARATOR_SPLIT_RE.split(line)
+
+    word_offset = 0
+    words = []
+    for word_text, sep in zip(parts[0::2], parts[1::2]):
+        if word_text:
+            words.append(WordInfo(id=None, type=WORD_TYPE.UNKNOWN, word=word_text, sep=sep, offset=word_offset))
+        word_offset += len((word_text + sep).encode('utf8'))
+
+    left_over = parts[-1]
+    # A line ending in a separator has nothing left over
+    return words, left_over if left_over.strip() else ''
+
+def is_abbreviation(word):
+    "Is word (or the end of it) an abbreviation or an initial"
+    match = TRAILING_WORD_RE.search(word)
+    if match is None:
+        return False
+    word = match.group(1)
+    return (len(word) == 1 and word.isalpha()) or word.lower() in ABBREVIATIONS
+
+def ends_sentence(word, sep):
+    "Does word followed by the separator sep end a sentence"
+    # seeksearch uses this too so that navigation
+    #   agrees with WordClassifier
+    if not any(c in sep for c in SENTENCE_END_CHARS):
+        return False
+    elif ends_clause(sep):
+        return False
+    elif not any(c in sep for c in CERTAIN_SENTENCE_END_CHARS):
+        return not is_abbreviation(word)
     else:
-        rest = line
-        while rest:
-            word_text, sep, rest = re_partition(rest, u'[, ;.—\-]+')
-            if word_text and sep is not None:
-                word_info = WordInfo(id=None, type=WORD_TYPE.UNKNOWN, word=word_text, sep=sep, offset=word_offset)
-                words.append(word_info)
-                word_offset += len((word_text + (sep or '')).encode('utf8'))
-
-        return words, word_text
-
-def re_partition(text, match_re):
-    "Like str.partition by uses a regular expression for splitting"
-    full_re = u'(.*?)({})(.*)'.format(match_re)
-    match = re.search(full_re, text)
-    if match:
-        return match.group(1), match.group(2), match.group(3)
-    else:
-        return text, None, ''
+        return True
+
+def ends_clause(sep):
+    "Is the separator sep a comma or something like it"
+    return any(c in sep for c in CLAUSE_END_CHARS)
 
 class WORD_TYPE(object):
     BEFORE_COMMA = 'before_comma'
@@ -65,14 +109,16 @@ class WordClassifier(object):
         if word_info.type != WORD_TYPE.UNKNOWN:
             return word_info.type
 
-        if last_word_type == WORD_TYPE.PARAGRAPH:
+        # Sentence ends come first so that they always
+        #   agree with seeksearch
+        if sep is not None and ends_sentence(word_info.word, sep):
+            return WORD_TYPE.SENTENCE_END
+        elif last_word_type == WORD_TYPE.PARAGRAPH:
             return WORD_TYPE.SENTENCE_BEGIN
         elif sep is None:
             return WORD_TYPE.NORMAL
-        elif ',' in sep or ';' in sep:
+        elif ends_clause(sep):
             return WORD_TYPE.BEFORE_COMMA
-        elif '.' in sep:
-            return WORD_TYPE.SENTENCE_END
         else:
             if last_word_type == WORD_TYPE.SENTENCE_END:
                 return WORD_TYPE.SENTENCE_BEGIN
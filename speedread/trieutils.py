@@ -0,0 +1,152 @@
+"A compact trie of words that can be memory-mapped from a file"
+import argparse
+import array
+import codecs
+import mmap
+import struct
+import sys
+
+MAGIC = 'SRTRIE01'
+
+# Magic, number of nodes, number of edges
+HEADER = struct.Struct('<8sII')
+
+# Index of first edge, number of edges
+NODE = struct.Struct('<II')
+
+ROOT = 0
+
+
+class Trie(object):
+    """Words stored as flat arrays of nodes, edge labels, edge targets and
+    word flags. Edges out of a node are contiguous and sorted by label.
+
+    Nodes are decoded into dictionaries the first time they are used so
+    opening a large file is instant and only the parts of the trie that
+    the text needs are ever read"""
+
+    def __init__(self, data):
+        magic, self.node_count, self.edge_count = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError('Not a trie file')
+        self.data = data
+        self._labels_offset = HEADER.size + self.node_count * NODE.size
+        self._targets_offset = self._labels_offset + 4 * self.edge_count
+        self._flags_offset = self._targets_offset + 4 * self.edge_count
+        self._children = {}
+
+    @classmethod
+    def open(cls, path):
+        with open(path, 'rb') as stream:
+            # The mapping stays valid after the file is closed
+            return cls(mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ))
+
+    @classmethod
+    def from_words(cls, words):
+        return cls(serialize(words))
+
+    def children(self, node):
+        "A dictionary from characters to (node, is_word) for the nodes they lead to"
+        if node in self._children:
+            return self._children[node]
+
+        first, count = NODE.unpack_from(self.data, HEADER.size + node * NODE.size)
+        labels = struct.unpack_from('<{}I'.format(count), self.data, self._labels_offset + 4 * first)
+        targets = struct.unpack_from('<{}I'.format(count), self.data, self._targets_offset + 4 * first)
+        # Nodes are breadth first so the targets are consecutive
+        flags = self.data[self._flags_offset + targets[0]:self._flags_offset + targets[-1] + 1] if count else ''
+        children = self._children[node] = dict(zip(map(unichr, labels), zip(targets, map(bool, bytearray(flags)))))
+        return children
+
+    def __contains__(self, word):
+        node, is_word = ROOT, False
+        for c in word:
+            child = self.children(node).get(c)
+            if child is None:
+                return False
+            node, is_word = child
+        return is_word
+
+    def longest_match(self, text, start=0, end=None):
+        "The end of the longest word in text[start:end] that starts at start, or None"
+        # This is the inner loop of segmenting so avoid method calls
+        cache = self._children
+        match_end = None
+        node = ROOT
+        for pos in xrange(start, len(text) if end is None else end):
+            children = cache[node] if node in cache else self.children(node)
+            child = children.get(text[pos])
+            if child is None:
+                break
+            node, is_word = child
+            if is_word:
+                match_end = pos + 1
+        return match_end
+
+
+def serialize(words):
+    "The bytes of a trie file containing words"
+    root = {}
+    # Nodes are dictionaries with None as a key for words
+    for word in words:
+        node = root
+        for c in word:
+            node = node.setdefault(c, {})
+        node[None] = True
+
+    # Breadth first so that each node's edges are together
+    nodes = [root]
+    labels = array.array('I')
+    targets = array.array('I')
+    node_edges = array.array('I')
+    flags = bytearray()
+    for node in nodes:
+        edges = sorted(c for c in node if c is not None)
+        node_edges.extend([len(labels), len(edges)])
+        flags.append(None in node)
+        for c in edges:
+            labels.append(ord(c))
+            targets.append(len(nodes))
+            nodes.append(node[c])
+
+    if sys.byteorder != 'little':
+        for values in (labels, targets, node_edges):
+            values.byteswap()
+
+    return ''.join([
+        HEADER.pack(MAGIC, len(nodes), len(labels)),
+        node_edges.tostring(),
+        labels.tostring(),
+        targets.tostring(),
+        str(flags)])
+
+def read_word_list(stream):
+    """Words from a utf8 file with a word at the start of each line. Anything
+    after the word (such as a frequency) is ignored"""
+    for line in codecs.getreader('utf8')(stream):
+        fields = line.split()
+        if fields:
+            yield fields[0]
+
+def load(path):
+    "Open a trie file, or build a trie from a word list"
+    with open(path, 'rb') as stream:
+        is_trie = stream.read(len(MAGIC)) == MAGIC
+        if not is_trie:
+            stream.seek(0)
+            return Trie.from_words(read_word_list(stream))
+    return Trie.open(path)
+
+def main():
+    PARSER = argparse.ArgumentParser(description='Compile a word list into a trie file for --dictionary')
+    PARSER.add_argument('word_list', type=str, help='File with a word at the start of each line')
+    PARSER.add_argument('output', type=str, help='Trie file to write')
+    args = PARSER.parse_args()
+
+    with open(args.word_list, 'rb') as stream:
+        data = serialize(read_word_list(stream))
+    with open(args.output, 'wb') as stream:
+        stream.write(data)
+
+if __name__ == '__main__':
+    main()
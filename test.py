@@ -1,7 +1,19 @@
-
+# encoding: utf8
+import os
+import shutil
+import tempfile
+import time
 import unittest
+import blessings
+import speedread.asyncutils
+import speedread.followutils
 import speedread.textutils
 import speedread.main
+import speedread.seeksearch
+import speedread.segmentutils
+import speedread.streamutils
+import speedread.termutils
+import speedread.trieutils
 import StringIO
 
 class CombinedTest(unittest.TestCase):
@@ -13,6 +25,36 @@ class CombinedTest(unittest.TestCase):
         self.assertEquals([word.sep for word in words], [' ', '  ', ', '])
         self.assertEquals([word.offset for word in words], [0, 5, 9])
 
+    def test_dictionary_segmenter(self):
+        directory = tempfile.mkdtemp()
+        try:
+            word_list = os.path.join(directory, 'words.txt')
+            with open(word_list, 'w') as f:
+                f.write(u'北京 3\n北京大学\n大学\n我们\n'.encode('utf8'))
+            line_to_words = speedread.segmentutils.PROFILES['cjk'](word_list)
+
+            trie_path = os.path.join(directory, 'words.trie')
+            with open(word_list) as words, open(trie_path, 'wb') as f:
+                f.write(speedread.trieutils.serialize(speedread.trieutils.read_word_list(words)))
+            trie = speedread.trieutils.load(trie_path)
+        finally:
+            shutil.rmtree(directory)
+
+        self.assertTrue(u'北京' in trie)
+        self.assertFalse(u'北' in trie)
+
+        for tokenizer in (line_to_words, speedread.segmentutils.DictionarySegmenter(trie).line_to_words):
+            # We + Peking University + full stop, I, Beijing + continued
+            line = u'我们北京大学。我 iPhone北京我们\n'
+            words, rest = tokenizer(line)
+            self.assertEquals([w.word for w in words], [u'我们', u'北京大学', u'我', u'iPhone', u'北京'])
+            self.assertEquals([w.sep for w in words], [u'', u'。', u' ', u'', u''])
+            self.assertEquals([w.offset for w in words], [0, 6, 21, 25, 31])
+            self.assertEquals(rest, u'我们\n')
+
+        # Latin text is unchanged
+        self.assertEquals(line_to_words(u'This is  a, line'), speedread.textutils.line_to_words(u'This is  a, line'))
+
     def test_read_line(self):
         #                      0 1234567 8 90123
         f = StringIO.StringIO('A\naa aaa\n\naaaa')
@@ -29,5 +71,353 @@ class CombinedTest(unittest.TestCase):
         self.assertEquals([w.word for w in words], ['A', 'aa', 'aaa', 'aaaa'])
         self.assertEquals([w.offset for w in words], [0, 2, 5, 10])
 
+    def test_unfinished_sentence(self):
+        reader = speedread.main.Reader(StringIO.StringIO('No full stop'))
+        self.assertEquals(reader.get_word().word, 'No')
+        self.assertEquals(reader.current_sentence(), 'No full stop')
+
+    def test_sentence_boundaries(self):
+        text = 'Mr. Smith paid 3.50 dollars. Why? Because!\nIt was e.g. fine\xe2\x80\xa6 really\n\nNew para. Last\n\nYes. No more.'
+        WORD_TYPE = speedread.textutils.WORD_TYPE
+
+        reader = speedread.main.Reader(StringIO.StringIO(text))
+        words = []
+        while True:
+            word = reader.get_word()
+            if word.type == WORD_TYPE.END_OF_FILE:
+                break
+            if word.type != WORD_TYPE.PARAGRAPH:
+                words.append(word)
+
+        # Navigation must agree with the classifier
+        sentence_starts = [word.offset for previous, word in zip(words, words[1:])
+            if previous.type in (WORD_TYPE.SENTENCE_END, WORD_TYPE.PARAGRAPH_END)]
+        self.assertEquals([text[offset:offset + 3] for offset in sentence_starts], ['Why', 'Bec', 'It ', 'rea', 'New', 'Las', 'Yes', 'No '])
+
+        for chunk_size in (7, 1000):
+            f = StringIO.StringIO(text)
+            boundaries = list(speedread.seeksearch.iter_sentence_boundaries(f, chunk_size=chunk_size))
+            self.assertEquals(boundaries, sentence_starts)
+
+            f.seek(len(text))
+            self.assertEquals(list(speedread.seeksearch.riter_sentence_boundaries(f, chunk_size=chunk_size)), boundaries[::-1] + [0])
+
+    def test_long_sentence_boundaries(self):
+        # Separator runs and blank lines longer than the context
+        for text in ['Aa bb. ' + '-' * 300 + ' Cc dd. Ee ff.', 'Aa bb.' + '\n' * 300 + 'Cc dd. Ee ff.']:
+            boundaries = list(speedread.seeksearch.iter_sentence_boundaries(StringIO.StringIO(text)))
+            self.assertEquals([text[offset:offset + 2] for offset in boundaries], ['Cc', 'Ee'])
+            for chunk_size in (7, 50, 128, 1000):
+                f = StringIO.StringIO(text)
+                f.seek(len(text))
+                self.assertEquals(list(speedread.seeksearch.riter_sentence_boundaries(f, chunk_size=chunk_size)), boundaries[::-1] + [0])
+
+    def test_block_line_reader(self):
+        f = StringIO.StringIO('one\ntw\xc3\xa9 three\n\nfour')
+        lines = speedread.streamutils.BlockLineReader(f, block_size=3)
+        result = []
+        while True:
+            offset = lines.tell()
+            line = lines.readline()
+            if not line:
+                break
+            result.append((offset, line))
+        self.assertEquals(result, [(0, u'one\n'), (4, u'tw\xe9 three\n'), (15, u'\n'), (16, u'four')])
+
+        lines.seek(9)
+        self.assertEquals(lines.readline(), u'three\n')
+        self.assertEquals(lines.tell(), 15)
+
+    def test_mailbox(self):
+        mailbox = speedread.asyncutils.Mailbox()
+        mailbox.put(1)
+        mailbox.put(2)
+        self.assertEquals(mailbox.get(), 2)
+        mailbox.put(None)
+        self.assertEquals(mailbox.get(), None)
+
+    def test_display(self):
+        out = StringIO.StringIO()
+        term = blessings.Terminal(stream=out)
+        display = speedread.main.Display(term, speedread.termutils.NonclearingWriter(out))
+        display.display_word('one', upcoming=['two'])
+        display.display_word('two', upcoming=['three'])
+        display.write_text('text')
+
+        # Only the latest word is shown but text is never dropped
+        frame = display.mailbox.get()
+        display.render(frame)
+        display.prerender(frame)
+        self.assertEquals(out.getvalue(), 'text\r\n          v ?\r\n         two\r\n')
+        self.assertEquals(display.prerendered.keys(), [('three', '?')])
+
+    def test_split_keys(self):
+        keys, rest = speedread.termutils.split_keys('a\x1b[Cb\xc3\xa9\x1bOP\x1bx\x1b[1')
+        self.assertEquals(keys, ['a', speedread.termutils.KEY_RIGHT, 'b', '\xc3\xa9', '\x1bOP', '\x1bx'])
+        self.assertEquals(rest, '\x1b[1')
+
+    def test_raw_keyboard(self):
+        read_fd, write_fd = os.pipe()
+        try:
+            with os.fdopen(read_fd) as stream:
+                with speedread.termutils.RawKeyboard(stream) as keyboard:
+                    os.write(write_fd, 'q\x1b[D\x1b')
+                    self.assertEquals(keyboard.read_key(), 'q')
+                    self.assertEquals(keyboard.read_key(), speedread.termutils.KEY_LEFT)
+                    # Escape on its own
+                    self.assertEquals(keyboard.read_key(), '\x1b')
+                    self.assertEquals(keyboard.read_key(timeout=0), None)
+        finally:
+            os.close(write_fd)
+
+    def test_long_lines(self):
+        def read_words(text, max_line_length):
+            f = StringIO.StringIO(text)
+            reader = speedread.main.Reader(f)
+            reader.lines = speedread.streamutils.BlockLineReader(f, block_size=7, max_line_length=max_line_length)
+            words = []
+            while True:
+                word = reader.get_word()
+                if word.type == speedread.textutils.WORD_TYPE.END_OF_FILE:
+                    return words
+                words.append(word)
+
+        text = 'One two thr\xc3\xa9e. Four, five six seven-eight. ' * 5 + 'end\n\nLast'
+        expected = read_words(text, 1000)
+        self.assertEquals(read_words(text, 12), expected)
+        for word in expected:
+            if word.type != speedread.textutils.WORD_TYPE.PARAGRAPH:
+                self.assertEquals(text[word.offset:].decode('utf8')[:len(word.word)], word.word)
+
+        # Cuts must not split numbers at their decimal points or long separators
+        text = 'Paid 3.50 now\xe2\x80\x94then 12.75. ' * 20 + 'end'
+        expected = read_words(text, 1000)
+        for max_line_length in range(8, 30):
+            self.assertEquals(read_words(text, max_line_length), expected)
+
+        split = speedread.streamutils.split_long_line
+        self.assertEquals(split('word ' * 99 + '12.5' * 200, 500)[0], 'word ' * 99)
+        # A run of separators that starts well before the limit
+        self.assertEquals(len(split('a' + ' ' * 400 + 'b' * 1000, 500)[0]), 401)
+
+        # Words much longer than the limit come out in pieces
+        long_word = 'A' + 'very' * 10 + 'longword'
+        pieces = read_words(long_word + ' end', 12)[:-1]
+        self.assertEquals(''.join(w.word for w in pieces), long_word)
+        self.assertTrue(all(len(w.word) <= 24 for w in pieces))
+        self.assertEquals([long_word[w.offset:][:len(w.word)] for w in pieces], [w.word for w in pieces])
+
+    def test_virtual_timer(self):
+        clock = speedread.asyncutils.VirtualClock()
+        timer = speedread.asyncutils.Timer(clock)
+        timer.set_delay(2)
+        timer.set_delay(1)
+        self.assertTrue(timer.wait())
+        self.assertEquals(clock.time(), 1)
+        # Nothing left to wait for
+        self.assertFalse(timer.wait())
+
+        # A tick replaces other expiry times
+        timer.set_delay(1)
+        timer.tick()
+        self.assertTrue(timer.wait())
+        self.assertEquals(clock.time(), 1)
+        self.assertFalse(timer.wait())
+
+        # Scheduled events wake us up
+        events = []
+        clock.schedule(3, lambda: events.append(clock.time()))
+        clock.schedule(2, timer.tick)
+        self.assertTrue(timer.wait())
+        self.assertEquals(clock.time(), 2)
+        self.assertFalse(timer.wait())
+        self.assertEquals(events, [3])
+
+    def make_simulation(self, text):
+        clock = speedread.asyncutils.VirtualClock()
+        out = StringIO.StringIO()
+        display = speedread.main.TimestampDisplay(out, clock)
+        reader = speedread.main.Reader(StringIO.StringIO(text))
+        pusher = speedread.main.Pusher(reader, display, 0.1, clock=clock)
+        return pusher, speedread.main.Controller(pusher, display), out
+
+    def test_simulated_session(self):
+        pusher, _controller, out = self.make_simulation('One two. Three\n')
+        pusher.run()
+        self.assertEquals(out.getvalue().splitlines(), ['0.000 One', '0.100 two. ', '0.200 Three', '0.600 THE_END'])
+
+    def test_simulated_script(self):
+        text = 'A one. B two. C three. D four. E five.'
+        # Keys are pressed a word period (0.1) apart while playing
+        pusher, controller, out = self.make_simulation(text)
+        controller.schedule_script('.......b.....b')
+        pusher.run()
+        self.assertEquals(out.getvalue().splitlines()[3:9], ['0.500 two. ', '0.600 C', '0.800 C', '1.100 three. ', '1.200 D', '1.400 D'])
+
+        pusher, controller, out = self.make_simulation(text)
+        controller.schedule_script('.......bb')
+        pusher.run()
+        self.assertEquals(out.getvalue().splitlines()[3:7], ['0.500 two. ', '0.600 C', '0.800 C', '0.900 B'])
+
+    def test_double_back_sentence(self):
+        text = 'A one. B two. C three. D four.'
+        pusher, controller, _out = self.make_simulation(text)
+        clock = controller.clock
+
+        pusher.seek(text.index('D'))
+        controller.handle_key('b')
+        clock.advance(0.2)
+        controller.handle_key('b')
+        self.assertEquals(pusher.reader.character_offset(), text.index('C'))
+
+        pusher.seek(text.index('D'))
+        clock.advance(1)
+        controller.handle_key('b')
+        clock.advance(1)
+        controller.handle_key('b')
+        self.assertEquals(pusher.reader.character_offset(), text.index('D'))
+
+    def test_jump_list(self):
+        text = ''.join('Sentence {0} is here. And {0} more words follow it.\n'.format(i) for i in range(50))
+        reads = []
+
+        class CountingStream(StringIO.StringIO):
+            def read(self, *args):
+                reads.append(args)
+                return StringIO.StringIO.read(self, *args)
+
+        pusher, controller, _out = self.make_simulation('')
+        pusher.reader = speedread.main.Reader(CountingStream(text))
+        words = [pusher.step().word for _ in range(3)]
+        self.assertEquals(words, ['Sentence', '0', 'is'])
+
+        pusher.forward_sentence()
+        self.assertEquals(pusher.step().word, 'And')
+        pusher.forward_sentence()
+        self.assertEquals(pusher.step().word, 'Sentence')
+
+        del reads[:]
+        # Each flip resumes where we left that place
+        for back_word, forward_word in [('0', '1'), ('more', 'is'), ('words', 'here')]:
+            controller.handle_key('\x0f')
+            self.assertEquals(pusher.step().word, back_word)
+            controller.handle_key('\t')
+            self.assertEquals(pusher.step().word, forward_word)
+        self.assertEquals(reads, [])
+
+        # Nothing further forward
+        controller.handle_key('\t')
+        self.assertEquals(pusher.step().word, 'And')
+
+    def test_snapshot_without_sentence_end(self):
+        text = ' '.join('w{}'.format(i) for i in range(1000)) + '. Next one.\n'
+        reader = speedread.main.Reader(StringIO.StringIO(text))
+        sentence = reader.current_sentence()
+        for _ in range(5):
+            reader.get_word()
+
+        snapshot = reader.snapshot()
+        self.assertTrue(len(snapshot.words) <= speedread.main.SNAPSHOT_WORDS)
+
+        def read_all():
+            words = []
+            while not words or words[-1][1] != speedread.textutils.WORD_TYPE.END_OF_FILE:
+                word = reader.get_word()
+                words.append((word.word, word.type, word.offset, word.id))
+            return words
+
+        expected = read_all()
+        reader.restore(snapshot)
+        self.assertEquals(reader.current_sentence(), sentence)
+        self.assertEquals(read_all(), expected)
+
+    def test_follow(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'log')
+            with open(path, 'w') as f:
+                f.write('aa bb\ncc')
+
+            with open(path) as stream:
+                follower = speedread.followutils.Follower(path, timeout=0.01)
+                reader = speedread.main.Reader(stream, follower=follower)
+                self.assertEquals(reader.get_word().word, 'aa')
+                self.assertEquals(reader.get_word().word, 'bb')
+                # Incomplete line
+                self.assertEquals(reader.get_word(), None)
+                self.assertEquals(reader.current_sentence(), 'aa bb')
+
+                with open(path, 'a') as f:
+                    f.write(' dd\n')
+                reader.wait_for_data()
+                words = [reader.get_word(), reader.get_word()]
+                self.assertEquals([w.word for w in words], ['cc', 'dd'])
+                self.assertEquals([w.offset for w in words], [6, 9])
+                self.assertEquals(reader.get_word(), None)
+
+                # Truncation
+                with open(path, 'w') as f:
+                    f.write('ee\n')
+                self.assertEquals(reader.get_word().word, 'ee')
+
+                # Rotation
+                os.rename(path, path + '.1')
+                with open(path, 'w') as f:
+                    f.write('ff\n')
+                self.assertEquals(reader.get_word().word, 'ff')
+                follower.close()
+        finally:
+            shutil.rmtree(directory)
+
+    def test_follow_wake(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'log')
+            with open(path, 'w') as f:
+                f.write('One. Two three.\n')
+
+            for watcher in (speedread.followutils.PollingWatcher(path, 0.25), speedread.followutils.InotifyWatcher.create(path)):
+                watcher.wake()
+                start = time.time()
+                self.assertTrue(watcher.wait(5))
+                self.assertTrue(time.time() - start < 1)
+                watcher.close()
+
+            shown = []
+            stopping = []
+
+            class RecordingDisplay(object):
+                def set_wpm(self, wpm):
+                    pass
+
+                def display_word(self, word, upcoming=()):
+                    if stopping:
+                        # Ends the thread quietly
+                        raise SystemExit()
+                    shown.append(word)
+
+            with open(path) as stream:
+                follower = speedread.followutils.Follower(path, timeout=5)
+                reader = speedread.main.Reader(stream, follower=follower)
+                pusher = speedread.main.Pusher(reader, RecordingDisplay(), 0.01)
+                thread = speedread.asyncutils.spawn(pusher.run)
+
+                # Caught up with the writer
+                time.sleep(0.3)
+                self.assertEquals(shown[-1], 'three.')
+                pusher.back_sentence()
+                start = time.time()
+                while shown[-1] != 'Two' and time.time() - start < 5:
+                    time.sleep(0.01)
+                self.assertTrue(time.time() - start < 1)
+
+                stopping.append(True)
+                pusher.back_sentence()
+                thread.join(5)
+                self.assertFalse(thread.is_alive())
+                follower.close()
+        finally:
+            shutil.rmtree(directory)
+
 if __name__ == "__main__":
 	unittest.main()